@@ -84,7 +84,9 @@ setup(
         'requests', 
         'networkx',
         'toml',
-        'torch>=1.3.0',
+        # 2.2 is needed for mmap loading and for load_state_dict
+        # assign=True keeping requires_grad on the model's parameters
+        'torch>=2.2.0',
         'tqdm',
     ],
 
@@ -281,6 +281,8 @@ def build_argparse():
 
     parser.add_argument('--log_norms', default=False, action='store_true', help='Log the parameters norms while training.  A very noisy option')
 
+    parser.add_argument('--compile', default=False, action='store_true', help='Use torch.compile on the classifier when loading it for inference.  Has no effect when loading a model to continue training')
+
     parser.add_argument('--wandb', action='store_true', help='Start a wandb session and write the results of training.  Only applies to training.  Use --wandb_name instead to specify a name')
     parser.add_argument('--wandb_name', default=None, help='Name of a wandb session to start when training.  Will default to the dataset short name')
 
@@ -514,7 +516,7 @@ def train_model(trainer, model_file, checkpoint_file, args, train_set, dev_set,
     # if this is a brand new training run, and we're saving all intermediate models, save the start model as well
     if args.save_intermediate_models and trainer.epochs_trained == 0:
         intermediate_file = intermediate_name(model_file, trainer.epochs_trained, args.dev_eval_scoring, 0.0)
-        trainer.save(intermediate_file, save_optimizer=False)
+        trainer.save_async(intermediate_file, save_optimizer=False)
     for trainer.epochs_trained in range(trainer.epochs_trained, args.max_epochs):
         running_loss = 0.0
         epoch_loss = 0.0
@@ -572,10 +574,15 @@ def train_model(trainer, model_file, checkpoint_file, args, train_set, dev_set,
         if args.wandb:
             wandb.log({'accuracy': accuracy, 'macro_f1': macro_f1, 'epoch_loss': epoch_loss}, step=trainer.global_step)
         if checkpoint_file:
-            trainer.save(checkpoint_file, epochs_trained = trainer.epochs_trained + 1)
+            # the checkpoint is overwritten every epoch, so delta saves
+            # rewrite only the tensors which changed since the base copy
+            trainer.save(checkpoint_file, epochs_trained = trainer.epochs_trained + 1, delta=True)
         if args.save_intermediate_models:
+            # intermediate models are never read back during training,
+            # so write them on the background thread while the next
+            # epoch starts
             intermediate_file = intermediate_name(model_file, trainer.epochs_trained + 1, args.dev_eval_scoring, dev_score)
-            trainer.save(intermediate_file, save_optimizer=False)
+            trainer.save_async(intermediate_file, save_optimizer=False)
         if trainer.best_score is None or dev_score > trainer.best_score:
             trainer.best_score = dev_score
             trainer.save(model_file, save_optimizer=False)
@@ -514,18 +514,25 @@ class CNNClassifier(BaseClassifier):
         return out
 
     def get_params(self, skip_modules=True):
+        # the tensors in the state dict share storage with the live
+        # parameters rather than being cloned - torch.save pickles the
+        # storages directly, so no extra pass over parameter memory is
+        # made when saving
         model_state = self.state_dict()
         # skip saving modules like pretrained embeddings, because they are large and will be saved in a separate file
+        skipped_modules = []
         if skip_modules:
+            skipped_modules = list(self.unsaved_modules)
             skipped = [k for k in model_state.keys() if self.is_unsaved_module(k)]
             for k in skipped:
                 del model_state[k]
 
         params = {
-            'model':        model_state,
-            'config':       self.config,
-            'labels':       self.labels,
-            'extra_vocab':  self.extra_vocab,
+            'model':           model_state,
+            'config':          self.config,
+            'labels':          self.labels,
+            'extra_vocab':     self.extra_vocab,
+            'skipped_modules': skipped_modules,
         }
         if self.config.use_peft:
             # Hide import so that peft dependency is optional
@@ -70,6 +70,8 @@ class ConstituencyClassifier(BaseClassifier):
         return out
 
     def get_params(self, skip_modules=True):
+        # the state dict tensors share storage with the live parameters,
+        # so building this dict does not copy any parameter memory
         model_state = self.state_dict()
         # skip all of the constituency parameters here -
         # we will add them by calling the model's get_params()
@@ -84,6 +86,7 @@ class ConstituencyClassifier(BaseClassifier):
             'tree_embedding':  tree_embedding,
             'config':          self.config,
             'labels':          self.labels,
+            'skipped_modules': ['tree_embedding'],
         }
         return params
 
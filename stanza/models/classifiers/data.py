@@ -6,7 +6,7 @@ import logging
 import json
 import random
 import re
-from typing import List
+from typing import Any, List, NamedTuple
 
 from stanza.models.classifiers.utils import WVType
 from stanza.models.common.vocab import PAD, PAD_ID, UNK, UNK_ID
@@ -14,27 +14,31 @@ import stanza.models.constituency.tree_reader as tree_reader
 
 logger = logging.getLogger('stanza')
 
-class SentimentDatum:
-    def __init__(self, sentiment, text, constituency=None):
-        self.sentiment = sentiment
-        self.text = text
-        self.constituency = constituency
+class SentimentDatum(NamedTuple):
+    """
+    A single labeled item, such as one review or one tweet
 
-    def __eq__(self, other):
-        if self is other:
-            return True
-        if not isinstance(other, SentimentDatum):
-            return False
-        return self.sentiment == other.sentiment and self.text == other.text and self.constituency == other.constituency
+    A NamedTuple rather than a regular class - these are allocated once
+    per line when ingesting a dataset, and the tuple layout is several
+    times smaller than instances carrying a __dict__
+    """
+    sentiment: Any
+    text: Any
+    constituency: Any = None
 
     def __str__(self):
         return str(self._asdict())
 
-    def _asdict(self):
-        if self.constituency is None:
-            return {'sentiment': self.sentiment, 'text': self.text}
-        else:
-            return {'sentiment': self.sentiment, 'text': self.text, 'constituency': str(self.constituency)}
+def _sentiment_datum_asdict(self):
+    if self.constituency is None:
+        return {'sentiment': self.sentiment, 'text': self.text}
+    else:
+        return {'sentiment': self.sentiment, 'text': self.text, 'constituency': str(self.constituency)}
+
+# typing.NamedTuple refuses an _asdict override in the class body,
+# but we want to keep the old json layout - no constituency field
+# unless one is set - so the method is attached after the fact
+SentimentDatum._asdict = _sentiment_datum_asdict
 
 def update_text(sentence: List[str], wordvec_type: WVType) -> List[str]:
     """
@@ -4,8 +4,12 @@ Organizes the model itself and its optimizer in one place
 Saving the optimizer allows for easy restarting of training
 """
 
+import concurrent.futures
+import hashlib
 import logging
 import os
+from copy import deepcopy
+
 import torch
 import torch.optim as optim
 
@@ -36,29 +40,209 @@ class Trainer:
         # save the best dev score so that when reloading a checkpoint
         # of a model, we know how far we got
         self.best_score = best_score
+        # background thread used by save_async, created on first use
+        # at most one save is in flight at a time
+        self._save_executor = None
+        self._save_future = None
+        # base file written by the first delta save, along with
+        # fingerprints of its tensors so later delta saves can skip
+        # tensors which have not changed.  plain full saves never
+        # touch either of these
+        self._last_saved_hashes = {}
+        self._base_checkpoint = None
+        # pinned host buffers reused between checkpoints to stage
+        # GPU tensors for serialization
+        self._pinned_buffers = {}
+
+    def _stage_state_to_cpu(self, model_state):
+        """
+        Snapshot a state dict to CPU, staging GPU tensors through pinned buffers
 
-    def save(self, filename, epochs_trained=None, skip_modules=True, save_optimizer=True):
+        The pinned buffers are kept on the Trainer and reused between
+        checkpoints.  The copies are issued non_blocking so the
+        GPU-to-host DMA transfers overlap each other, with a single
+        synchronize at the end instead of a serial blocking copy per
+        parameter.  CPU tensors are snapshotted with a plain clone.
+        """
+        staged = {}
+        synchronize = False
+        for name, tensor in model_state.items():
+            if tensor.device.type == "cpu":
+                staged[name] = tensor.detach().clone()
+                continue
+            buffer = self._pinned_buffers.get(name)
+            if buffer is None or buffer.shape != tensor.shape or buffer.dtype != tensor.dtype:
+                buffer = torch.empty_like(tensor, device="cpu", pin_memory=True)
+                self._pinned_buffers[name] = buffer
+            buffer.copy_(tensor, non_blocking=True)
+            staged[name] = buffer
+            synchronize = True
+        if synchronize:
+            torch.cuda.synchronize()
+        return staged
+
+    @staticmethod
+    def _tensor_hash(tensor):
+        """
+        Cheap content fingerprint used to detect tensors unchanged since the last full save
+        """
+        data = tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8)
+        return hashlib.blake2b(data.numpy().tobytes(), digest_size=16).digest()
+
+    def _wait_for_async_save(self):
+        """
+        Block until any in-flight async save has finished
+        """
+        if self._save_future is not None:
+            self._save_future.result()
+            self._save_future = None
+
+    @staticmethod
+    def _atomic_save(params, filename):
+        """
+        torch.save to a temp file in the same directory, then rename it into place
+
+        On a resumed run the live parameters can be mmap-backed by the
+        old checkpoint file, and torch.save truncates its target before
+        reading the tensors - writing in place would destroy the very
+        pages being serialized.  The rename leaves the old inode alive
+        for any existing mappings and means a crash never leaves a
+        half-written checkpoint behind.
+        """
+        tmp_filename = filename + ".tmp"
+        torch.save(params, tmp_filename)
+        os.replace(tmp_filename, filename)
+
+    def save(self, filename, epochs_trained=None, skip_modules=True, save_optimizer=True, delta=False):
         """
         save the current model, optimizer, and other state to filename
 
         epochs_trained can be passed as a parameter to handle saving at the end of an epoch
+
+        delta=True writes an incremental checkpoint: the first such save
+        writes an immutable full copy of the model next to the checkpoint
+        (filename + ".base") and later saves write only the tensors whose
+        bytes changed since that base, plus the base path.  With a mostly
+        frozen model (bert, charlm) the per-checkpoint write shrinks to
+        roughly the trained parameters.  Plain full saves never hash or
+        track anything.
         """
         if epochs_trained is None:
             epochs_trained = self.epochs_trained
         save_dir = os.path.split(filename)[0]
         os.makedirs(save_dir, exist_ok=True)
+        # don't overlap with a save_async still writing an earlier checkpoint
+        self._wait_for_async_save()
         model_params = self.model.get_params(skip_modules)
+        if any(tensor.device.type != "cpu" for tensor in model_params['model'].values()):
+            # overlapped DMA through pinned buffers instead of a
+            # blocking GPU->pageable copy per parameter during pickling
+            model_params['model'] = self._stage_state_to_cpu(model_params['model'])
         params = {
             'params':         model_params,
             'epochs_trained': epochs_trained,
             'global_step':    self.global_step,
             'best_score':     self.best_score,
         }
+        if delta:
+            model_state = model_params['model']
+            current_hashes = {name: self._tensor_hash(tensor) for name, tensor in model_state.items()}
+            if self._base_checkpoint is None:
+                # first delta save: write a full, immutable copy of the
+                # model for the deltas to reference.  the base is never
+                # rewritten, so each delta stays cumulative against it.
+                # the path is stored absolute so a resumed run started
+                # from a different cwd can still find it
+                base_filename = os.path.abspath(filename) + ".base"
+                self._atomic_save({'params': model_params}, base_filename)
+                logger.info("Base checkpoint saved to {}".format(base_filename))
+                self._last_saved_hashes = current_hashes
+                self._base_checkpoint = base_filename
+            delta_state = {name: tensor for name, tensor in model_state.items()
+                           if current_hashes[name] != self._last_saved_hashes.get(name)}
+            logger.debug("Delta checkpoint relative to %s: writing %d of %d tensors",
+                         self._base_checkpoint, len(delta_state), len(model_state))
+            model_params = dict(model_params)
+            model_params['model'] = delta_state
+            params['params'] = model_params
+            params['base_checkpoint'] = self._base_checkpoint
         if save_optimizer and self.optimizer is not None:
             params['optimizer_state_dict'] = {opt_name: opt.state_dict() for opt_name, opt in self.optimizer.items()}
-        torch.save(params, filename, _use_new_zipfile_serialization=False)
+        dtype_map = self._downcast_frozen_weights(model_params)
+        if dtype_map:
+            params['dtype_map'] = dtype_map
+        self._atomic_save(params, filename)
         logger.info("Model saved to {}".format(filename))
 
+    # module names used by CNNClassifier for the transformer and charlms
+    FROZEN_PREFIXES = ("bert_model.", "forward_charlm.", "backward_charlm.")
+
+    def _downcast_frozen_weights(self, model_params):
+        """
+        Downcast fp32 weights of frozen modules to bf16 before saving
+
+        Trainer.load rebuilds frozen modules from their original files
+        rather than reading these copies back, so storing them in bf16
+        halves their disk footprint without affecting accuracy.
+        Returns a map of the original dtypes so other readers of the
+        checkpoint can upcast them again.  Weights which are being
+        finetuned (requires_grad still set) are left alone.
+
+        In the default skip_modules=True save these modules are dropped
+        from the state dict entirely, so this only reduces full
+        skip_modules=False checkpoints.
+        """
+        requires_grad = {name: param.requires_grad for name, param in self.model.named_parameters()}
+        dtype_map = {}
+        model_state = model_params['model']
+        for name, tensor in model_state.items():
+            if (name.startswith(self.FROZEN_PREFIXES)
+                    and tensor.dtype == torch.float32
+                    and not requires_grad.get(name, False)):
+                dtype_map[name] = tensor.dtype
+                model_state[name] = tensor.to(torch.bfloat16)
+        return dtype_map
+
+    def save_async(self, filename, epochs_trained=None, skip_modules=True, save_optimizer=True):
+        """
+        Save the model on a background thread so the training loop can continue
+
+        The state dicts are snapshotted to CPU before the thread starts,
+        so the live parameters are free to keep training while
+        serialization runs.  At most one save is in flight at a time - a
+        new call first waits for the previous one to finish.  Returns
+        the Future for the background write.
+        """
+        if epochs_trained is None:
+            epochs_trained = self.epochs_trained
+        save_dir = os.path.split(filename)[0]
+        os.makedirs(save_dir, exist_ok=True)
+        self._wait_for_async_save()
+        model_params = self.model.get_params(skip_modules)
+        # the model keeps training while the background thread runs, so
+        # the state is snapshotted to (pinned) CPU buffers first
+        model_params['model'] = self._stage_state_to_cpu(model_params['model'])
+        params = {
+            'params':         model_params,
+            'epochs_trained': epochs_trained,
+            'global_step':    self.global_step,
+            'best_score':     self.best_score,
+        }
+        if save_optimizer and self.optimizer is not None:
+            params['optimizer_state_dict'] = {opt_name: deepcopy(opt.state_dict()) for opt_name, opt in self.optimizer.items()}
+        dtype_map = self._downcast_frozen_weights(model_params)
+        if dtype_map:
+            params['dtype_map'] = dtype_map
+        if self._save_executor is None:
+            self._save_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        def write_checkpoint():
+            Trainer._atomic_save(params, filename)
+            logger.info("Model saved to {}".format(filename))
+
+        self._save_future = self._save_executor.submit(write_checkpoint)
+        return self._save_future
+
     @staticmethod
     def load(filename, args, foundation_cache=None, load_optimizer=False):
         if not os.path.exists(filename):
@@ -68,8 +252,23 @@ class Trainer:
                 filename = os.path.join(args.save_dir, filename)
             else:
                 raise FileNotFoundError("Cannot find model in {} or in {}".format(filename, os.path.join(args.save_dir, filename)))
+        if hasattr(os, 'posix_fadvise'):
+            # ask the kernel to start streaming the checkpoint in now,
+            # overlapping the disk reads with the foundation model setup
+            # below - especially helpful on cold cluster filesystems
+            fd = os.open(filename, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
         try:
-            checkpoint = torch.load(filename, lambda storage, loc: storage)
+            try:
+                # mmap lets the OS page tensor storages in on demand
+                # instead of reading the entire checkpoint up front
+                checkpoint = torch.load(filename, map_location="cpu", mmap=True, weights_only=False)
+            except RuntimeError:
+                # models saved in the legacy (non-zipfile) format cannot be mmap'd
+                checkpoint = torch.load(filename, map_location="cpu", weights_only=False)
         except BaseException:
             logger.exception("Cannot load model from {}".format(filename))
             raise
@@ -89,42 +288,77 @@ class Trainer:
             }
         else:
             model_params = checkpoint['params']
+        if 'base_checkpoint' in checkpoint:
+            # delta checkpoint: overlay the changed tensors on the full
+            # checkpoint they were saved relative to
+            try:
+                base = torch.load(checkpoint['base_checkpoint'], map_location="cpu", mmap=True, weights_only=False)
+            except RuntimeError:
+                base = torch.load(checkpoint['base_checkpoint'], map_location="cpu", weights_only=False)
+            model_state = dict(base['params']['model'])
+            for name, dtype in base.get('dtype_map', {}).items():
+                if name in model_state:
+                    model_state[name] = model_state[name].to(dtype)
+            model_state.update(model_params['model'])
+            model_params = dict(model_params)
+            model_params['model'] = model_state
+        # frozen weights may have been stored in bf16 - restore their
+        # original dtype before they are assigned into the model
+        dtype_map = checkpoint.get('dtype_map', {})
+        if dtype_map:
+            model_state = dict(model_params['model'])
+            for name, dtype in dtype_map.items():
+                if name in model_state:
+                    model_state[name] = model_state[name].to(dtype)
+            model_params = dict(model_params)
+            model_params['model'] = model_state
         model_type = model_params['config'].model_type
 
         if model_type == ModelType.CNN:
-            pretrain = Trainer.load_pretrain(args, foundation_cache)
-            elmo_model = utils.load_elmo(args.elmo_model) if args.use_elmo else None
             # TODO: existing models don't have this attribute, so we
             # use None as not having a setting.  If the setting is
             # False, though, we don't load the charlm
             # We don't want to pass a charlm to a model which doesn't use one
             has_charlm_forward = getattr(model_params['config'], 'has_charlm_forward', None)
-            if has_charlm_forward != False:
-                charmodel_forward = load_charlm(args.charlm_forward_file, foundation_cache)
-            else:
-                charmodel_forward = None
             has_charlm_backward = getattr(model_params['config'], 'has_charlm_backward', None)
-            if has_charlm_backward != False:
-                charmodel_backward = load_charlm(args.charlm_backward_file, foundation_cache)
-            else:
-                charmodel_backward = None
 
             bert_model = model_params['config'].bert_model
             # TODO: can get rid of the getattr after rebuilding all models
             use_peft = getattr(model_params['config'], 'use_peft', False)
             force_bert_saved = getattr(model_params['config'], 'force_bert_saved', False)
             peft_name = None
-            if use_peft:
-                # if loading a peft model, we first load the base transformer
-                # the CNNClassifier code wraps the transformer in peft
-                # after creating the CNNClassifier with the peft wrapper,
-                # we *then* load the weights
-                bert_model, bert_tokenizer, peft_name = load_bert_with_peft(bert_model, "classifier", foundation_cache)
-                bert_model = load_peft_wrapper(bert_model, model_params['bert_lora'], vars(model_params['config']), logger, peft_name)
-            elif force_bert_saved:
-                bert_model, bert_tokenizer = load_bert(bert_model)
-            else:
-                bert_model, bert_tokenizer = load_bert(bert_model, foundation_cache)
+            # the pretrain, elmo, charlm, and bert loads each read a
+            # different file, so issuing them on threads overlaps the
+            # disk latency - torch.load releases the GIL during I/O.
+            # note that a FoundationCache takes a single lock around
+            # every load, so with a cache the loads mostly run one at a
+            # time; the full overlap happens with foundation_cache=None
+            # or when the models are already cached
+            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+                pretrain_future = executor.submit(Trainer.load_pretrain, args, foundation_cache)
+                elmo_future = executor.submit(utils.load_elmo, args.elmo_model) if args.use_elmo else None
+                charlm_forward_future = executor.submit(load_charlm, args.charlm_forward_file, foundation_cache) if has_charlm_forward != False else None
+                charlm_backward_future = executor.submit(load_charlm, args.charlm_backward_file, foundation_cache) if has_charlm_backward != False else None
+                if use_peft:
+                    # if loading a peft model, we first load the base transformer
+                    # the CNNClassifier code wraps the transformer in peft
+                    # after creating the CNNClassifier with the peft wrapper,
+                    # we *then* load the weights
+                    bert_future = executor.submit(load_bert_with_peft, bert_model, "classifier", foundation_cache)
+                elif force_bert_saved:
+                    bert_future = executor.submit(load_bert, bert_model)
+                else:
+                    bert_future = executor.submit(load_bert, bert_model, foundation_cache)
+
+                pretrain = pretrain_future.result()
+                elmo_model = elmo_future.result() if elmo_future is not None else None
+                charmodel_forward = charlm_forward_future.result() if charlm_forward_future is not None else None
+                charmodel_backward = charlm_backward_future.result() if charlm_backward_future is not None else None
+                if use_peft:
+                    bert_model, bert_tokenizer, peft_name = bert_future.result()
+                    bert_model = load_peft_wrapper(bert_model, model_params['bert_lora'], vars(model_params['config']), logger, peft_name)
+                else:
+                    bert_model, bert_tokenizer = bert_future.result()
             model = cnn_classifier.CNNClassifier(pretrain=pretrain,
                                                  extra_vocab=model_params['extra_vocab'],
                                                  labels=model_params['labels'],
@@ -151,9 +385,58 @@ class Trainer:
                                                                    args=model_params['config'])
         else:
             raise ValueError("Unknown model type {}".format(model_type))
-        model.load_state_dict(model_params['model'], strict=False)
+        # frozen modules such as bert / charlm / pretrain were rebuilt
+        # above through the foundation cache, so drop any of their keys
+        # (possible via a delta checkpoint's base or an old full save)
+        # rather than have load_state_dict re-copy identical weights.
+        # modules the model treats as unsaved are dropped even if a
+        # skip_modules=False checkpoint included them: those copies may
+        # have been stored in lossy bf16, and the rebuilt modules can
+        # be shared through the cache, so installing the roundtripped
+        # weights would degrade every other model using the cache
+        skipped_modules = set(model_params.get('skipped_modules', []))
+        skipped_modules.update(k.split('.')[0] for k in model_params['model'].keys()
+                               if model.is_unsaved_module(k))
+        if skipped_modules:
+            model_state = {k: v for k, v in model_params['model'].items()
+                           if k.split('.')[0] not in skipped_modules}
+            if len(model_state) != len(model_params['model']):
+                model_params = dict(model_params)
+                model_params['model'] = model_state
+        # assign=True adopts the checkpoint tensors directly - with an
+        # mmap'd checkpoint the trained weights come straight from the
+        # mapped storage instead of being copied into the freshly
+        # allocated parameters.  requires_grad of the model's own
+        # parameters is preserved.  only done for inference loads: a
+        # model loaded to continue training would otherwise keep
+        # parameters aliased to the checkpoint file it is about to
+        # overwrite.  in both cases, modules not present in the
+        # checkpoint (frozen bert, charlm, pretrain) keep the weights
+        # the constructor just loaded for them
+        model.load_state_dict(model_params['model'], strict=False, assign=not load_optimizer)
         model = model.to(args.device)
 
+        if getattr(args, 'compile', False) and not load_optimizer:
+            # only for inference loads - a compiled wrapper prefixes the
+            # state dict keys, which would break a later save.
+            # a persistent inductor cache lets new processes reuse the
+            # compiled kernels instead of paying the warmup again
+            if getattr(args, 'save_dir', None):
+                os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.join(args.save_dir, ".inductor_cache"))
+            try:
+                # torch.compile only builds a wrapper here - the actual
+                # compilation is deferred to the first forward pass.
+                # suppress_errors makes a backend failure at that point
+                # (eg an environment without triton) fall back to eager
+                # instead of raising in the middle of inference
+                import torch._dynamo
+                torch._dynamo.config.suppress_errors = True
+                model = torch.compile(model, mode="reduce-overhead", dynamic=True)
+                logger.debug("Compiled classifier with torch.compile")
+            except Exception as e:
+                # a torch build without dynamo support at all
+                logger.warning("Could not compile the classifier, continuing with the eager model: %s", e)
+
         logger.debug("-- MODEL CONFIG --")
         for k in model.config.__dict__:
             logger.debug("  --{}: {}".format(k, model.config.__dict__[k]))
@@ -194,6 +477,10 @@ class Trainer:
             logger.debug("Pretrain not found.  Looking in {}".format(vec_file))
         pretrain = Pretrain(pretrain_file, vec_file, args.pretrain_max_vocab)
         logger.debug("Embedding shape: %s" % str(pretrain.emb.shape))
+        if foundation_cache is not None:
+            # remember the freshly built pretrain so repeated loads
+            # (eg cross-validation or a sweep) don't re-read the vectors
+            pretrain = foundation_cache.add_pretrain(pretrain_file, pretrain)
         return pretrain
 
 
@@ -105,6 +105,20 @@ class FoundationCache:
 
             return self.pretrains[filename]
 
+    def add_pretrain(self, filename, pretrain):
+        """
+        Keep an already constructed Pretrain for future load_pretrain calls
+
+        Useful when a pretrain was just built from a raw vector file, so
+        repeated loads don't re-read the embedding from disk
+
+        Uses a lock for thread safety
+        """
+        with self.lock:
+            if filename not in self.pretrains:
+                self.pretrains[filename] = pretrain
+            return self.pretrains[filename]
+
 class NoTransformerFoundationCache(FoundationCache):
     """
     Uses the underlying FoundationCache, but hiding the transformer.
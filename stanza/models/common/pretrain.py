@@ -2,9 +2,12 @@
 Supports for pretrained data.
 """
 import csv
+import mmap
 import os
 import re
 
+from contextlib import contextmanager
+
 import lzma
 import logging
 import numpy as np
@@ -17,6 +20,30 @@ from stanza.resources.common import DEFAULT_MODEL_DIR
 
 logger = logging.getLogger('stanza')
 
+@contextmanager
+def _open_vec_file(filename):
+    """
+    Open a raw vector file for reading lines of bytes
+
+    Plain (uncompressed) files are memory-mapped, so the file contents
+    are paged in by the kernel as they are read instead of being copied
+    onto the Python heap.  Compressed files go through open_read_binary
+    as before.
+    """
+    if filename.endswith((".xz", ".gz", ".zip")):
+        with open_read_binary(filename) as fin:
+            yield fin
+    else:
+        with open(filename, "rb") as fin:
+            try:
+                mapped = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # an empty file, for example, cannot be mapped
+                yield fin
+                return
+            with mapped:
+                yield iter(mapped.readline, b"")
+
 class PretrainedWordVocab(BaseVocab):
     def build_vocab(self):
         self._id2unit = VOCAB_PREFIX + self.data
@@ -53,7 +80,11 @@ class Pretrain:
     def load(self):
         if self.filename is not None and os.path.exists(self.filename):
             try:
-                data = torch.load(self.filename, lambda storage, loc: storage)
+                try:
+                    data = torch.load(self.filename, map_location="cpu", mmap=True, weights_only=False)
+                except RuntimeError:
+                    # pretrains saved in the legacy non-zipfile format cannot be mmap'd
+                    data = torch.load(self.filename, map_location="cpu", weights_only=False)
                 logger.debug("Loaded pretrain from {}".format(self.filename))
                 if not isinstance(data, dict):
                     raise RuntimeError("File {} exists but is not a stanza pretrain file.  It is not a dict, whereas a Stanza pretrain should have a dict with 'emb' and 'vocab'".format(self.filename))
@@ -90,7 +121,8 @@ class Pretrain:
         # should not infinite loop since the load function sets _vocab and _emb before trying to save
         data = {'vocab': self.vocab.state_dict(), 'emb': self.emb}
         try:
-            torch.save(data, filename, _use_new_zipfile_serialization=False, pickle_protocol=3)
+            # the zipfile format lets later loads mmap the embedding
+            torch.save(data, filename, pickle_protocol=3)
             logger.info("Saved pretrained vocab and vectors to {}".format(filename))
         except (KeyboardInterrupt, SystemExit):
             raise
@@ -171,7 +203,7 @@ class Pretrain:
         lines = []
         failed = 0
         unk_line = None
-        with open_read_binary(filename) as f:
+        with _open_vec_file(filename) as f:
             for i, line in enumerate(f):
                 try:
                     line = line.decode()
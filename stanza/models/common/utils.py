@@ -297,6 +297,20 @@ def get_split_optimizer(name, model, lr, betas=(0.9, 0.999), eps=1e-8, momentum=
     if weight_decay is not None:
         extra_args["weight_decay"] = weight_decay
 
+    # the optimizer step is memory bound on the parameter bytes, so one
+    # fused (or foreach) kernel per step is much faster than a kernel
+    # launch per parameter tensor.  fused needs the params on CUDA and
+    # is only implemented for the Adam family; everything else gets the
+    # multi-tensor foreach implementation, which also helps on CPU
+    try:
+        device = next(model.parameters()).device
+    except StopIteration:
+        device = None
+    if name in ('adam', 'adamw', 'amsgrad', 'amsgradw') and device is not None and device.type == 'cuda':
+        extra_args['fused'] = True
+    elif name in ('adam', 'adamw', 'amsgrad', 'amsgradw', 'sgd', 'adadelta', 'adagrad', 'adamax'):
+        extra_args['foreach'] = True
+
     optimizers = {
         "general_optimizer": dispatch_optimizer(name, parameters, opt_logger=logger, lr=lr, betas=betas, eps=eps, momentum=momentum, **extra_args)
     }
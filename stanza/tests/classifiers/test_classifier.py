@@ -105,6 +105,60 @@ class TestClassifier:
         args.load_name = save_filename
         trainer = Trainer.load(args.load_name, args)
 
+    def test_delta_checkpoint(self, tmp_path, fake_embeddings, train_file, dev_file):
+        """
+        Test that delta checkpoints write a base file, shrink, and round trip through load
+        """
+        trainer, _, args = self.build_model(tmp_path, fake_embeddings, train_file, dev_file, extra_args=["--bilstm_hidden_dim", "20"])
+
+        checkpoint_file = os.path.join(args.save_dir, "checkpoint.pt")
+        trainer.save(checkpoint_file, delta=True)
+        assert os.path.exists(checkpoint_file)
+        assert os.path.exists(checkpoint_file + ".base")
+
+        # perturb some weights, as training would, so the next delta is not empty
+        with torch.no_grad():
+            for parameter in trainer.model.fc_layers[-1].parameters():
+                parameter.add_(1.0)
+        trainer.save(checkpoint_file, delta=True)
+
+        checkpoint = torch.load(checkpoint_file, lambda storage, loc: storage)
+        assert checkpoint['base_checkpoint'] == os.path.abspath(checkpoint_file) + ".base"
+        full_state = trainer.model.get_params()['model']
+        # only the perturbed tensors should be in the delta
+        assert 0 < len(checkpoint['params']['model']) < len(full_state)
+
+        args.load_name = checkpoint_file
+        loaded = Trainer.load(args.load_name, args)
+        loaded_state = loaded.model.get_params()['model']
+        assert full_state.keys() == loaded_state.keys()
+        for name in full_state.keys():
+            assert torch.allclose(full_state[name], loaded_state[name])
+
+    def test_save_async(self, tmp_path, fake_embeddings, train_file, dev_file):
+        """
+        Test that an async save round trips through load and that a later save waits for it
+        """
+        trainer, _, args = self.build_model(tmp_path, fake_embeddings, train_file, dev_file, extra_args=["--bilstm_hidden_dim", "20"])
+
+        save_filename = os.path.join(args.save_dir, args.save_name)
+        future = trainer.save_async(save_filename)
+        future.result()
+        assert os.path.exists(save_filename)
+
+        args.load_name = save_filename
+        loaded = Trainer.load(args.load_name, args)
+        full_state = trainer.model.get_params()['model']
+        loaded_state = loaded.model.get_params()['model']
+        assert full_state.keys() == loaded_state.keys()
+        for name in full_state.keys():
+            assert torch.allclose(full_state[name], loaded_state[name])
+
+        # a synchronous save must wait for any write still in flight
+        future = trainer.save_async(save_filename)
+        trainer.save(save_filename)
+        assert future.done()
+
     def test_train_basic(self, tmp_path, fake_embeddings, train_file, dev_file):
         self.run_training(tmp_path, fake_embeddings, train_file, dev_file, extra_args=["--bilstm_hidden_dim", "20"])
 
@@ -167,6 +221,35 @@ class TestClassifier:
         assert not saved_model['params']['config'].force_bert_saved
         assert not any(x.startswith("bert_model") for x in saved_model['params']['model'].keys())
 
+    def test_save_frozen_bf16(self, tmp_path, fake_embeddings, train_file, dev_file):
+        """
+        Test that a skip_modules=False save stores frozen bert weights in bf16
+
+        The weights should be restored to fp32 when the model is loaded
+        """
+        bert_model = "hf-internal-testing/tiny-bert"
+
+        trainer, _, args = self.build_model(tmp_path, fake_embeddings, train_file, dev_file, extra_args=["--bilstm_hidden_dim", "20", "--bert_model", bert_model])
+
+        save_filename = os.path.join(args.save_dir, args.save_name)
+        trainer.save(save_filename, skip_modules=False)
+
+        saved_model = torch.load(save_filename, lambda storage, loc: storage)
+        saved_state = saved_model['params']['model']
+        bf16_keys = [x for x in saved_state.keys() if saved_state[x].dtype == torch.bfloat16]
+        assert len(bf16_keys) > 0
+        assert all(x.startswith("bert_model.") for x in bf16_keys)
+        assert set(saved_model['dtype_map'].keys()) == set(bf16_keys)
+
+        args.load_name = save_filename
+        loaded = Trainer.load(args.load_name, args)
+        # the bf16 copies in the checkpoint must never be installed -
+        # the load rebuilds the frozen bert, keeping it bit-identical
+        original = dict(trainer.model.bert_model.named_parameters())
+        for name, parameter in loaded.model.bert_model.named_parameters():
+            assert parameter.dtype == torch.float32
+            assert torch.equal(parameter, original[name])
+
     def test_finetune_bert(self, tmp_path, fake_embeddings, train_file, dev_file):
         """
         Test on a tiny Bert WITH finetuning, which hopefully does not take up too much disk space or memory
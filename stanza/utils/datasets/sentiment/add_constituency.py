@@ -97,8 +97,10 @@ def main():
             doc = pipe(text)
 
         assert len(dataset) == len(doc.sentences)
-        for datum, sentence in zip(dataset, doc.sentences):
-            datum.constituency = sentence.constituency
+        # SentimentDatum is a NamedTuple, so attach the trees by
+        # rebuilding the datums rather than mutating them
+        dataset = [datum._replace(constituency=sentence.constituency)
+                   for datum, sentence in zip(dataset, doc.sentences)]
 
         process_utils.write_list(output_filename, dataset)
 
@@ -255,6 +255,7 @@ from stanza.utils.datasets.sentiment import process_corona
 from stanza.utils.datasets.sentiment import process_es_tass2020
 from stanza.utils.datasets.sentiment import process_it_sentipolc16
 from stanza.utils.datasets.sentiment import process_MELD
+from stanza.utils.datasets.sentiment import process_pl_polemo2
 from stanza.utils.datasets.sentiment import process_ren_chinese
 from stanza.utils.datasets.sentiment import process_sb10k
 from stanza.utils.datasets.sentiment import process_scare
@@ -362,6 +363,11 @@ def convert_sb10k(paths, dataset_name, *args):
                         "--split", "train_dev",
                         *column_args])
 
+def convert_pl_polemo2(paths, dataset_name, *args):
+    in_directory = os.path.join(paths['SENTIMENT_BASE'], "polish", "polemo2")
+    out_directory = paths['SENTIMENT_DATA_DIR']
+    process_pl_polemo2.main(in_directory, out_directory, dataset_name)
+
 def convert_vi_vsfc(paths, dataset_name, *args):
     in_directory = os.path.join(paths['SENTIMENT_BASE'], "vietnamese", "_UIT-VSFC")
     out_directory = paths['SENTIMENT_DATA_DIR']
@@ -414,6 +420,8 @@ DATASET_MAPPING = {
 
     "mr_l3cube":    convert_mr_l3cube,
 
+    "pl_polemo2":   convert_pl_polemo2,
+
     "vi_vsfc":      convert_vi_vsfc,
 
     "zh-hans_ren":  convert_ren,
@@ -0,0 +1,151 @@
+"""
+Processes the PolEmo2.0 Polish sentiment corpus, available here:
+
+https://clarin-pl.eu/dspace/handle/11321/710
+
+The corpus is in fastText format: one review per line, with the label
+appended at the end of the line, eg
+
+  Lekarz zalecil mi kuracje , ktora zupelnie nie pomogla . __label__z_minus_m
+
+Reviews labeled ambiguous are dropped.  The remaining labels are mapped
+to the 0/1/2 negative/neutral/positive scheme the classifier expects.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import sys
+
+from tqdm import tqdm
+
+import stanza
+from stanza.models.classifiers.data import SentimentDatum
+import stanza.utils.datasets.sentiment.process_utils as process_utils
+
+import stanza.utils.default_paths as default_paths
+
+# the ambiguous reviews (__label__z_amb / __label__meta_amb) are
+# deliberately left out of the map so they get skipped
+# the keys are bytes so labels can be matched before any UTF-8 decoding
+LABEL_MAP = {
+    b"__label__z_minus_m":    "0",
+    b"__label__z_zero":       "1",
+    b"__label__z_plus_m":     "2",
+    b"__label__meta_minus_m": "0",
+    b"__label__meta_zero":    "1",
+    b"__label__meta_plus_m":  "2",
+}
+
+def read_sentences_and_labels(filename):
+    """
+    Read a fastText format file into a list of SentimentDatum
+
+    Lines whose label is not in LABEL_MAP (the ambiguous reviews) are
+    skipped.  The text is kept raw - tokenization happens in a later pass.
+
+    The file is read in one gulp and processed with a single list
+    comprehension - one rpartition and one dict lookup per line - which
+    is noticeably faster than a line-at-a-time loop on large corpora.
+    The labels are matched as raw bytes, so only the text of the
+    accepted lines is ever decoded from UTF-8.
+    """
+    with open(filename, "rb", buffering=1<<20) as fin:
+        lines = fin.read().splitlines()
+    return [SentimentDatum(LABEL_MAP[label], text.decode("utf-8"))
+            for line in lines
+            for text, _, label in [line.rstrip().rpartition(b" ")]
+            if label in LABEL_MAP]
+
+def tokenize(pipe, sentiment_data):
+    """
+    Retokenize the raw text of each SentimentDatum with the stanza tokenizer
+
+    The texts are wrapped in Documents and handed to the pipeline in a
+    single call, so the neural tokenizer can mini-batch the reviews
+    instead of running a forward pass per review.
+
+    Duplicated reviews are common in this corpus, so only the unique
+    texts are run through the tokenizer; the results are then scattered
+    back to every datum sharing that text.
+    """
+    unique = dict.fromkeys(datum.text for datum in sentiment_data)
+    texts = list(unique)
+    in_docs = [stanza.Document([], text=text) for text in texts]
+    out_docs = pipe(in_docs)
+    for text, doc in zip(texts, tqdm(out_docs)):
+        unique[text] = [token.text for sentence in doc.sentences for token in sentence.tokens]
+    return [SentimentDatum(datum.sentiment, unique[datum.text]) for datum in sentiment_data]
+
+# pipeline built once per worker process by _init_tokenize_worker
+_PIPE = None
+
+def _init_tokenize_worker(batch_size):
+    global _PIPE
+    # the workers run one per core, so they stay on CPU rather than all
+    # piling onto one GPU, and rely on the parent process having already
+    # downloaded the model rather than racing each other to fetch it
+    _PIPE = stanza.Pipeline("pl", processors='tokenize', tokenize_batch_size=batch_size,
+                            use_gpu=False, download_method=None)
+
+def _tokenize_chunk(chunk):
+    return tokenize(_PIPE, chunk)
+
+def process_dataset(in_directory, out_directory, short_name, num_workers=None):
+    """
+    Convert each of train/dev/test, tokenizing across num_workers processes
+
+    Each worker builds its own pipeline, so the tokenizer runs on all
+    cores instead of serializing the three splits behind one pipeline.
+    num_workers=None uses one worker per cpu; num_workers=1 keeps
+    everything in this process.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count()
+    dataset = []
+    if num_workers > 1:
+        # download the tokenizer once here - the workers are started
+        # with download_method=None so they don't race each other
+        stanza.download("pl", processors="tokenize")
+        # spawn rather than fork so the workers don't inherit any of
+        # the parent's torch state
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers, mp_context=context,
+                                                    initializer=_init_tokenize_worker, initargs=(64,)) as executor:
+            for shard in process_utils.SHARDS:
+                filename = os.path.join(in_directory, "all.sentence.%s.txt" % shard)
+                sentiment_data = read_sentences_and_labels(filename)
+                chunk_size = max(1, (len(sentiment_data) + num_workers - 1) // num_workers)
+                chunks = [sentiment_data[start:start+chunk_size]
+                          for start in range(0, len(sentiment_data), chunk_size)]
+                dataset.append([datum for chunk in executor.map(_tokenize_chunk, chunks) for datum in chunk])
+    else:
+        pipe = stanza.Pipeline("pl", processors='tokenize', tokenize_batch_size=64)
+        for shard in process_utils.SHARDS:
+            filename = os.path.join(in_directory, "all.sentence.%s.txt" % shard)
+            sentiment_data = read_sentences_and_labels(filename)
+            dataset.append(tokenize(pipe, sentiment_data))
+    process_utils.write_dataset(dataset, out_directory, short_name)
+
+def main(in_directory, out_directory, short_name):
+    process_dataset(in_directory, out_directory, short_name)
+
+if __name__ == '__main__':
+    paths = default_paths.get_default_paths()
+
+    if len(sys.argv) <= 1:
+        in_directory = os.path.join(paths['SENTIMENT_BASE'], "polish", "polemo2")
+    else:
+        in_directory = sys.argv[1]
+
+    if len(sys.argv) <= 2:
+        out_directory = paths['SENTIMENT_DATA_DIR']
+    else:
+        out_directory = sys.argv[2]
+
+    if len(sys.argv) <= 3:
+        short_name = 'pl_polemo2'
+    else:
+        short_name = sys.argv[3]
+
+    main(in_directory, out_directory, short_name)